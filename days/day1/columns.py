@@ -0,0 +1,45 @@
+from array import array
+from typing import Iterator
+import mmap
+
+CHUNK_SIZE = 1 << 24
+
+
+def iter_column_chunks(
+    filename: str, chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[array, array]]:
+    """
+    Map the file and parse it a chunk at a time into pairs of int64 arrays.
+
+    Chunks are cut on newlines, so only one chunk's worth of tokens is ever
+    alive as Python objects at a time.
+    """
+    with open(filename, "rb") as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # can't map an empty file
+            return
+        with mm:
+            start = 0
+            size = len(mm)
+            while start < size:
+                end = min(start + chunk_size, size)
+                if end < size:
+                    newline = mm.rfind(b"\n", start, end)
+                    if newline == -1:  # a line longer than the chunk
+                        newline = mm.find(b"\n", end)
+                        if newline == -1:
+                            newline = size - 1
+                    end = newline + 1
+                numbers = array("q", map(int, mm[start:end].split()))
+                yield numbers[0::2], numbers[1::2]
+                start = end
+
+
+def load_columns(filename: str) -> tuple[array, array]:
+    left = array("q")
+    right = array("q")
+    for l, r in iter_column_chunks(filename):
+        left.extend(l)
+        right.extend(r)
+    return left, right
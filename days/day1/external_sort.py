@@ -0,0 +1,130 @@
+from array import array
+from contextlib import contextmanager
+from typing import Iterator
+import heapq
+import os
+import tempfile
+
+from columns import iter_column_chunks
+
+# rough cost of one value while a run is being sorted (the int object plus
+# its slot in the list sorted() builds), used to size runs against the budget
+SORT_COST_PER_ITEM = 40
+# rough cost of one value while its chunk is being parsed (its share of the
+# chunk's bytes, plus the bytes object split() makes for it and its list slot)
+PARSE_COST_PER_ITEM = 64
+ITEM_SIZE = array("q").itemsize
+# how many run files each column may have open at once while merging
+MAX_FAN_IN = 32
+
+
+def write_run(values: array, directory: str) -> str:
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "wb") as f:
+        array("q", sorted(values)).tofile(f)
+    return path
+
+
+def read_run(path: str, block_items: int) -> Iterator[int]:
+    with open(path, "rb") as f:
+        while True:
+            block = array("q")
+            try:
+                block.fromfile(f, block_items)
+            except EOFError:
+                # fromfile keeps whatever it managed to read before the end
+                yield from block
+                return
+            yield from block
+
+
+def merge_down(runs: list[str], directory: str, block_items: int) -> list[str]:
+    """
+    Merge groups of runs into longer runs until at most MAX_FAN_IN are left.
+    """
+    while len(runs) > MAX_FAN_IN:
+        merged: list[str] = []
+        for i in range(0, len(runs), MAX_FAN_IN):
+            group = runs[i : i + MAX_FAN_IN]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+            with os.fdopen(fd, "wb") as f:
+                out = array("q")
+                streams = [read_run(run, block_items) for run in group]
+                for value in heapq.merge(*streams):
+                    out.append(value)
+                    if len(out) >= block_items:
+                        out.tofile(f)
+                        del out[:]
+                out.tofile(f)
+            for run in group:
+                os.remove(run)
+            merged.append(path)
+        runs = merged
+    return runs
+
+
+def pairs_per_run(budget: int) -> int:
+    """
+    Runs and parse chunks hold the same number of pairs. At the peak, either a
+    chunk of pairs is being parsed or a run of one column is being sorted,
+    while each column buffers up to a run and a chunk of values.
+    """
+    parsing = 2 * PARSE_COST_PER_ITEM
+    # sorted() builds its list from a slice, then the result is copied back
+    sorting = SORT_COST_PER_ITEM + 2 * ITEM_SIZE
+    buffered = 2 * 2 * ITEM_SIZE
+    return max(1, budget // (max(parsing, sorting) + buffered))
+
+
+def line_length(filename: str) -> int:
+    with open(filename, "rb") as f:
+        return max(1, len(f.readline()))
+
+
+def spill_sorted_runs(
+    filename: str, budget: int, directory: str
+) -> tuple[list[str], list[str]]:
+    """
+    Split both columns into sorted runs small enough to sort inside the budget
+    and write each run to its own file.
+    """
+    run_items = pairs_per_run(budget)
+    # the first line stands in for the rest when turning pairs into bytes
+    chunk_size = run_items * line_length(filename)
+    left_runs: list[str] = []
+    right_runs: list[str] = []
+    left = array("q")
+    right = array("q")
+    for l, r in iter_column_chunks(filename, chunk_size):
+        left.extend(l)
+        right.extend(r)
+        while len(left) >= run_items:
+            left_runs.append(write_run(left[:run_items], directory))
+            right_runs.append(write_run(right[:run_items], directory))
+            del left[:run_items]
+            del right[:run_items]
+    if len(left):
+        left_runs.append(write_run(left, directory))
+        right_runs.append(write_run(right, directory))
+    return left_runs, right_runs
+
+
+@contextmanager
+def external_sorted_columns(
+    filename: str, budget: int
+) -> Iterator[tuple[Iterator[int], Iterator[int]]]:
+    """
+    Yield the two columns of the file as sorted streams, keeping roughly
+    `budget` bytes in memory no matter how big the file is.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        left_runs, right_runs = spill_sorted_runs(filename, budget, directory)
+        block_items = max(1, budget // (2 * (MAX_FAN_IN + 1) * ITEM_SIZE))
+        left_runs = merge_down(left_runs, directory, block_items)
+        right_runs = merge_down(right_runs, directory, block_items)
+        left = heapq.merge(*[read_run(path, block_items) for path in left_runs])
+        right = heapq.merge(*[read_run(path, block_items) for path in right_runs])
+        yield left, right
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
+from collections import Counter
 from typing import TextIO
 
 from itertools import zip_longest
-import sys
+import argparse
+
+from columns import load_columns
 
 
 def get_lists(raw: TextIO) -> tuple[dict[int, int], dict[int, int]]:
@@ -25,7 +28,6 @@ def compare_lists(left: dict[int, int], right: dict[int, int]) -> int:
     total = 0
     for number, count in left.items():
         similarity = number * count * right.get(number, 0)
-        print(f"{number=}, {count=}, {similarity=}")
         total += similarity
     return total
 
@@ -35,9 +37,17 @@ def sort_list(ls: list) -> list:
 
 
 def main():
-    with open(sys.argv[1]) as f:
-        left, right = get_lists(f)
-    print(compare_lists(left, right))
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--numpy", action="store_true", help="use the numpy engine")
+    args = parser.parse_args()
+    if args.numpy:
+        import vectorized
+
+        print(vectorized.similarity(*vectorized.load_arrays(args.filename)))
+        return
+    left, right = load_columns(args.filename)
+    print(compare_lists(Counter(left), Counter(right)))
 
 
 if __name__ == "__main__":
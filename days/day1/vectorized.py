@@ -0,0 +1,24 @@
+import numpy as np
+
+from columns import load_columns
+
+
+def load_arrays(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    left, right = load_columns(filename)
+    # zero-copy views over the array('q') buffers
+    return np.frombuffer(left, dtype=np.int64), np.frombuffer(right, dtype=np.int64)
+
+
+def distance(left: np.ndarray, right: np.ndarray) -> int:
+    return int(np.abs(np.sort(left) - np.sort(right)).sum())
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> int:
+    numbers, left_counts = np.unique(left, return_counts=True)
+    right_numbers, right_counts = np.unique(right, return_counts=True)
+    if not len(right_numbers):
+        return 0
+    idx = np.searchsorted(right_numbers, numbers)
+    idx[idx == len(right_numbers)] = 0
+    matched = right_numbers[idx] == numbers
+    return int((numbers * left_counts * right_counts[idx])[matched].sum())
@@ -93,15 +93,12 @@ class TrailTrie:
         )
 
     def __str__(self):
-        s = ""
-        for row in self.volcano_map.tiles:
-            for tile in row:
-                if tile.coord in self.all_steps:
-                    s += str(tile.elev)
-                else:
-                    s += "."
-            s += "\n"
-        return s
+        steps = self.all_steps
+        return "".join(
+            "".join(str(tile.elev) if tile.coord in steps else "." for tile in row)
+            + "\n"
+            for row in self.volcano_map.tiles
+        )
 
 
 def main() -> None:
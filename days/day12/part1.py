@@ -1,6 +1,12 @@
+import argparse
+import itertools
+import os
 import sys
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from render import render  # noqa: E402
 
 
 @dataclass(order=True, frozen=True)
@@ -71,16 +77,14 @@ class Region:
     def __contains__(self, plot: "Plot"):
         return plot in self.plots
 
-    def print(self, grid):
-        s = ""
-        for row in grid.tiles:
-            for plot in row:
-                if plot in self:
-                    s += self.plant.char
-                else:
-                    s += "."
-            s += "\n"
-        print(s)
+    def rows(
+        self, grid: "Grid", height: int | None = None, width: int | None = None
+    ) -> Iterator[str]:
+        for row in itertools.islice(grid.tiles, height):
+            yield "".join(
+                self.plant.char if plot in self else "."
+                for plot in itertools.islice(row, width)
+            )
 
 
 @dataclass(unsafe_hash=True)
@@ -131,8 +135,14 @@ class Grid:
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--show", action="store_true", help="render each region")
+    parser.add_argument("--height", type=int, help="only render this many rows")
+    parser.add_argument("--width", type=int, help="only render this many columns")
+    args = parser.parse_args()
     farm = Grid()
-    with open(sys.argv[1]) as f:
+    with open(args.filename) as f:
         for y, line in enumerate(f.readlines()):
             line = line.strip()
             farm.tiles.append([])
@@ -150,7 +160,9 @@ def main():
     total = 0
     for plant, regions in farm.regions.items():
         for region in regions:
-            region.print(farm)
+            if args.show:
+                render(region.rows(farm, args.height, args.width))
+                sys.stdout.write("\n")
             total += region.fence_cost
     print(total)
 
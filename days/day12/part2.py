@@ -1,7 +1,12 @@
+import argparse
+import itertools
+import os
 import sys
 from dataclasses import dataclass, field
-from typing import Optional
-import itertools
+from typing import Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from render import render  # noqa: E402
 
 
 @dataclass(order=True, frozen=True)
@@ -106,7 +111,6 @@ class Region:
 
             for row_column, fence_group in itertools.groupby(fences_, filter_function):
                 group = list(fence_group)
-                print(f"{row_column=}, {heading=}, {group=}")
                 sides += process_fences_by_row_column(fences_=group, heading=heading)
             return sides
 
@@ -124,7 +128,6 @@ class Region:
             last_pos = -1
             run_starts = list()
             for fence in fences_:
-                print(f"\t\t{fence=}")
                 this_pos = pos(fence)
                 if last_pos == -1:
                     # prime the loop
@@ -134,7 +137,6 @@ class Region:
                 if abs(this_pos - last_pos) != 1:
                     run_starts.append(this_pos)
                 last_pos = this_pos
-            print(f"\t{run_starts=}")
             return len(run_starts)
 
         fences = []
@@ -147,7 +149,6 @@ class Region:
         for heading, group in itertools.groupby(fences, lambda x: x.heading):
             fence_group = list(group)
             sides += process_fences_by_heading(fence_group, heading)
-        print(f"{sides=}")
         return sides
 
     @property
@@ -161,16 +162,14 @@ class Region:
     def __contains__(self, plot: "Plot"):
         return plot in self.plots
 
-    def print(self, grid):
-        s = ""
-        for row in grid.tiles:
-            for plot in row:
-                if plot in self:
-                    s += self.plant.char
-                else:
-                    s += "."
-            s += "\n"
-        print(s)
+    def rows(
+        self, grid: "Grid", height: int | None = None, width: int | None = None
+    ) -> Iterator[str]:
+        for row in itertools.islice(grid.tiles, height):
+            yield "".join(
+                self.plant.char if plot in self else "."
+                for plot in itertools.islice(row, width)
+            )
 
 
 @dataclass(unsafe_hash=True)
@@ -241,8 +240,14 @@ class Grid:
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--show", action="store_true", help="render each region")
+    parser.add_argument("--height", type=int, help="only render this many rows")
+    parser.add_argument("--width", type=int, help="only render this many columns")
+    args = parser.parse_args()
     farm = Grid()
-    with open(sys.argv[1]) as f:
+    with open(args.filename) as f:
         for y, line in enumerate(f.readlines()):
             line = line.strip()
             farm.tiles.append([])
@@ -261,10 +266,11 @@ def main():
     total_discount = 0
     for plant, regions in farm.regions.items():
         for region in regions:
-            region.print(farm)
+            if args.show:
+                render(region.rows(farm, args.height, args.width))
+                sys.stdout.write("\n")
             discount_cost = region.fence_cost_discount
             # print(f"{region.fence_cost=}")
-            print(f"{discount_cost=}")
             total_old += region.fence_cost
             total_discount += discount_cost
     print(f"{total_old=}, {total_discount=}")
@@ -0,0 +1,102 @@
+import numpy as np
+
+
+def load_reports(filename: str) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parse every report into one flat array of levels, plus offsets so that
+    report r is levels[offsets[r] : offsets[r + 1]]
+    """
+    with open(filename, "rb") as f:
+        data = f.read()
+    raw = np.frombuffer(data, dtype=np.uint8)
+    # spaces, tabs, carriage returns and newlines all sort at or below " "
+    is_space = np.concatenate(([True], raw <= ord(" "), [True]))
+    # tokens start where a space run ends and end where the next one starts,
+    # so the edges alternate between the two
+    edges = np.flatnonzero(np.diff(is_space.view(np.int8)))
+    token_starts = edges[0::2]
+    token_ends = edges[1::2]
+    line_ends = np.append(np.flatnonzero(raw == ord("\n")), len(raw))
+    lengths = np.diff(np.searchsorted(token_starts, line_ends), prepend=0)
+    lengths = lengths[lengths > 0]  # blank lines aren't reports
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    return parse_levels(data, token_starts, token_ends), offsets
+
+
+def parse_levels(
+    data: bytes, token_starts: np.ndarray, token_ends: np.ndarray
+) -> np.ndarray:
+    """
+    Read every token's digits at once, one column at a time: the k-th pass
+    folds in the k-th digit of every token that's long enough to have one
+    """
+    if not len(token_starts):
+        return np.zeros(0, dtype=np.int64)
+    raw = np.frombuffer(data, dtype=np.uint8)
+    negative = raw[token_starts] == ord("-")
+    first_digits = token_starts + negative
+    widths = token_ends - first_digits
+    width = int(widths.max())
+    # padding keeps the k-th digit of the last token in bounds
+    raw = np.frombuffer(data + b" " * width, dtype=np.uint8)
+    # nine digits always fit in an int32, which halves the memory traffic
+    levels = (raw[first_digits] - ord("0")).astype(np.int32 if width <= 9 else np.int64)
+    for k in range(1, width):
+        digits = raw[first_digits + k] - ord("0")
+        levels = np.where(widths > k, levels * 10 + digits, levels)
+    levels = levels.astype(np.int64)
+    levels[negative] *= -1
+    return levels
+
+
+def safe_steps(deltas: np.ndarray, direction: int) -> np.ndarray:
+    steps = deltas * direction
+    return (steps >= 1) & (steps <= 3)
+
+
+def safe_without_removals(levels: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    deltas = np.diff(levels)
+    # deltas within report r are deltas[offsets[r] : offsets[r + 1] - 1]
+    starts = offsets[:-1]
+    ends = offsets[1:] - 1
+    safe = np.zeros(len(starts), dtype=bool)
+    for direction in (1, -1):
+        bad = np.concatenate(([0], np.cumsum(~safe_steps(deltas, direction))))
+        safe |= bad[ends] == bad[starts]
+    return safe
+
+
+def safe_with_one_removal(levels: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """
+    For every level at once, check if the report is safe with that level
+    removed: the deltas before it and after it have to be safe, and so does
+    the step that bridges over it.
+    """
+    deltas = np.diff(levels)
+    lengths = np.diff(offsets)
+    report_of_level = np.repeat(np.arange(len(lengths)), lengths)
+    start = offsets[report_of_level]
+    last = offsets[report_of_level + 1] - 1
+    g = np.arange(len(levels))
+    before = np.maximum(g - 1, start)
+    after = np.minimum(g + 1, last)
+    interior = (g > start) & (g < last)
+    bridge = levels[np.minimum(g + 1, len(levels) - 1)] - levels[np.maximum(g - 1, 0)]
+
+    removable = np.zeros(len(levels), dtype=bool)
+    for direction in (1, -1):
+        bad = np.concatenate(([0], np.cumsum(~safe_steps(deltas, direction))))
+        removable |= (
+            (bad[before] == bad[start])
+            & (bad[last] == bad[after])
+            & (~interior | safe_steps(bridge, direction))
+        )
+    return np.add.reduceat(removable, offsets[:-1]) > 0
+
+
+def count_safe(levels: np.ndarray, offsets: np.ndarray, max_removals: int) -> int:
+    if max_removals == 0:
+        return int(safe_without_removals(levels, offsets).sum())
+    if max_removals == 1:
+        return int(safe_with_one_removal(levels, offsets).sum())
+    raise ValueError("batch mode only handles up to one removal")
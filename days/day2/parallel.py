@@ -0,0 +1,48 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+import os
+
+
+def split_ranges(filename: str, parts: int) -> list[tuple[int, int]]:
+    """
+    Cut the file into roughly equal byte ranges that start and end on line
+    boundaries
+    """
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, "rb") as f:
+        for i in range(1, parts):
+            target = max(size * i // parts, bounds[-1])
+            if target == 0:
+                continue
+            # back up one byte so a range that already starts a line keeps it
+            f.seek(target - 1)
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+
+
+def count_safe_in_range(
+    filename: str, start: int, end: int, report_type: type, kwargs: dict[str, Any]
+) -> int:
+    safe = 0
+    with open(filename, "rb") as f:
+        f.seek(start)
+        while f.tell() < end:
+            line = f.readline().decode().strip()
+            if line and report_type(line).is_safe(**kwargs):
+                safe += 1
+    return safe
+
+
+def count_safe(filename: str, workers: int, report_type: type, **kwargs: Any) -> int:
+    """
+    Classify each byte range in its own process. Only the counts come back.
+    """
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(count_safe_in_range, filename, start, end, report_type, kwargs)
+            for start, end in split_ranges(filename, workers)
+        ]
+        return sum(future.result() for future in futures)
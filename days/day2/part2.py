@@ -1,49 +1,110 @@
 #!/usr/bin/env python3
 
-import sys
+import argparse
 
 
-def sign(num):
-    return -1 if num < 0 else 1
-
-
-def list_without(l: list, i: int) -> list:
-    l2 = [x for x in l]
-    del l2[i]
-    return l2
+def is_step_safe(a: int, b: int, direction: int) -> bool:
+    return 1 <= (b - a) * direction <= 3
 
 
 class Report:
     def __init__(self, input_: str) -> None:
         self.levels = [int(i) for i in input_.split(" ")]
 
-    def is_safe(self) -> bool:
-        def is_list_safe(levels) -> bool:
-            last_delta = 0
-            for i in range(len(levels) - 1):
-                delta = levels[i + 1] - levels[i]
-                if i == 0:
-                    last_delta = delta
-                if sign(last_delta) != sign(delta):
-                    return False
-                if abs(delta) not in (1, 2, 3):
-                    return False
-                last_delta = delta
-
-            return True
-
-        if is_list_safe(self.levels):
-            return True
-        for skip in range(len(self.levels)):
-            if is_list_safe(list_without(self.levels, skip)):
+    def is_safe(self, max_removals: int = 1) -> bool:
+        if max_removals == 1:
+            return self.is_safe_in_direction(1) or self.is_safe_in_direction(-1)
+        return any(
+            self.is_safe_with_removals(direction, max_removals) for direction in (1, -1)
+        )
+
+    def is_safe_in_direction(self, direction: int) -> bool:
+        """
+        Walk the levels once, tracking whether they're safe so far with nothing
+        removed, and whether they're safe so far with one level removed
+        """
+        levels = self.levels
+        # clean: safe up to and including levels[i] with nothing removed
+        # clean_before: the same, but for levels[i - 1]
+        # damped: safe up to and including levels[i] with one level removed
+        clean_before = True
+        clean = True
+        damped = False
+        for i in range(1, len(levels)):
+            step = is_step_safe(levels[i - 1], levels[i], direction)
+            # drop levels[i - 1] and step over it
+            skip = clean_before and (
+                i == 1 or is_step_safe(levels[i - 2], levels[i], direction)
+            )
+            damped = (damped and step) or skip
+            clean_before, clean = clean, clean and step
+            if not any((clean_before, clean, damped)):
+                return False
+        # clean_before covers dropping the last level
+        return clean or damped or clean_before
+
+    def is_safe_with_removals(self, direction: int, max_removals: int) -> bool:
+        """
+        Check if removing up to max_removals levels makes the report safe.
+
+        safe[j] has bit r set when levels[: j + 1] can be made safe, keeping
+        levels[j], by removing r of the levels before it. Only the last
+        max_removals + 1 kept levels can precede levels[j], so this is
+        O(n * max_removals) bitmask steps.
+        """
+        levels = self.levels
+        n = len(levels)
+        in_budget = (1 << (max_removals + 1)) - 1
+        safe: list[int] = []
+        for j in range(n):
+            reachable = 1 << j if j <= max_removals else 0
+            for i in range(max(0, j - 1 - max_removals), j):
+                if safe[i] and is_step_safe(levels[i], levels[j], direction):
+                    reachable |= safe[i] << (j - 1 - i)
+            safe.append(reachable & in_budget)
+        # whatever comes after the last kept level is removed too
+        for j in range(max(0, n - 1 - max_removals), n):
+            if safe[j] & (in_budget >> (n - 1 - j)):
                 return True
         return False
 
 
-def main():
-    with open(sys.argv[1]) as f:
+def main(max_removals: int = 1):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--max-removals",
+        type=int,
+        default=max_removals,
+        help="how many levels the dampener may remove (0 matches part 1)",
+    )
+    parser.add_argument(
+        "--batch", action="store_true", help="check all reports at once with numpy"
+    )
+    parser.add_argument(
+        "--workers", type=int, help="split the file across this many processes"
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers is not None:
+        import parallel
+
+        safe = parallel.count_safe(
+            args.filename, args.workers, Report, max_removals=args.max_removals
+        )
+        print(safe)
+        return
+    if args.batch:
+        if args.max_removals > 1:
+            parser.error("--batch only handles up to one removal")
+        import batch
+
+        print(batch.count_safe(*batch.load_reports(args.filename), args.max_removals))
+        return
+    with open(args.filename) as f:
         reports = [Report(line.strip()) for line in f.readlines()]
-    safe_reports = [report for report in reports if report.is_safe()]
+    safe_reports = [report for report in reports if report.is_safe(args.max_removals)]
     print(len(safe_reports))
 
 
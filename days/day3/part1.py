@@ -1,6 +1,9 @@
 import re
 import sys
 from dataclasses import dataclass
+from typing import Iterator, TextIO
+
+from scanner import iter_matches
 
 
 MUL_FINDER = re.compile(r"(?P<instruction>mul)\((?P<first>\d+),(?P<second>\d+)\)")
@@ -13,23 +16,25 @@ class Mul:
     y: int
 
 
+def parse_match(match: re.Match) -> Mul:
+    d = match.groupdict()
+    return Mul(d["instruction"], int(d["first"]), int(d["second"]))
+
+
 def parse_line(line: str) -> list[Mul]:
-    ints: list[Mul] = []
-    for match in MUL_FINDER.finditer(line):
-        d = match.groupdict()
-        ints.append(Mul(d["instruction"], int(d["first"]), int(d["second"])))
-    return ints
+    return [parse_match(match) for match in MUL_FINDER.finditer(line)]
+
+
+def parse_stream(f: TextIO) -> Iterator[Mul]:
+    for match in iter_matches(f, MUL_FINDER):
+        yield parse_match(match)
 
 
 def main() -> None:
-    instructions: list[Mul] = []
-    with open(sys.argv[1]) as f:
-        for line in f.readlines():
-            results = parse_line(line)
-            instructions.extend(results)
     total = 0
-    for instruction in instructions:
-        total += instruction.x * instruction.y
+    with open(sys.argv[1]) as f:
+        for instruction in parse_stream(f):
+            total += instruction.x * instruction.y
     print(total)
 
 
@@ -1,12 +1,25 @@
+import argparse
+import mmap
+import operator
+import os
 import re
-import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import TypeAlias
+from typing import Iterable, Iterator, TextIO, TypeAlias
+
+from scanner import iter_matches
 
 PARSER = re.compile(
     r"((?P<instruction>mul)\((?P<first>\d+),(?P<second>\d+)\))|(?P<do>do\(\))|(?P<donot>don't\(\))"
 )
 
+MUL_OPERANDS = re.compile(rb"mul\((\d++,\d++)\)")
+PARSER_BYTES = re.compile(rb"mul\((\d+),(\d+)\)|do\(\)|don't\(\)")
+
+Buffer: TypeAlias = bytes | mmap.mmap
+# how many bytes of an enabled stretch run_bytes scans at once
+WINDOW = 1 << 20
+
 
 @dataclass
 class State:
@@ -39,33 +52,200 @@ DONOT = Toggle(False)
 DO = Toggle(True)
 
 
+def parse_match(match: re.Match) -> Instruction | None:
+    d = match.groupdict()
+    if d["instruction"]:
+        return Mul(d["instruction"], int(d["first"]), int(d["second"]))
+    elif d["do"]:
+        return DO
+    elif d["donot"]:
+        return DONOT
+    return None
+
+
 def parse_line(line) -> list[Instruction]:
     program: list[Instruction] = []
     for match in PARSER.finditer(line):
-        d = match.groupdict()
-        if d["instruction"]:
-            program.append(Mul(d["instruction"], int(d["first"]), int(d["second"])))
-        elif d["do"]:
-            program.append(DO)
-        elif d["donot"]:
-            program.append(DONOT)
+        instruction = parse_match(match)
+        if instruction is not None:
+            program.append(instruction)
     return program
 
 
-def run_program(program: list[Instruction]) -> int:
+def parse_stream(f: TextIO) -> Iterator[Instruction]:
+    for match in iter_matches(f, PARSER):
+        instruction = parse_match(match)
+        if instruction is not None:
+            yield instruction
+
+
+def run_program(program: Iterable[Instruction]) -> int:
     state = State()
     for instruction in program:
         instruction.apply(state)
     return state.total
 
 
+class NumberCache(dict):
+    """
+    bytes -> int for the operands seen so far. They're short and repeat a lot,
+    so most of them come out of the dict instead of going through int().
+    """
+
+    def __missing__(self, digits: bytes) -> int:
+        number = self[digits] = int(digits)
+        return number
+
+
+def enabled_stretches(data: bytes, enabled: bool = True) -> tuple[list[bytes], bool]:
+    """
+    The parts of data that aren't between a don't() and the next do(), and
+    whether multiplication is still enabled at the end of it
+    """
+    stretches: list[bytes] = []
+    pos = 0
+    if not enabled:
+        pos = data.find(b"do()")
+        if pos == -1:
+            return stretches, False
+        pos += len(b"do()")
+    while True:
+        stop = data.find(b"don't()", pos)
+        if stop == -1:
+            stretches.append(data[pos:])
+            return stretches, True
+        stretches.append(data[pos:stop])
+        pos = data.find(b"do()", stop)
+        if pos == -1:
+            return stretches, False
+        pos += len(b"do()")
+
+
+def sum_products(operands: list[bytes], numbers: NumberCache) -> int:
+    if not operands:
+        return 0
+    values = map(numbers.__getitem__, b",".join(operands).split(b","))
+    # the same iterator twice, so mul gets each x and y pair in turn
+    return sum(map(operator.mul, values, values))
+
+
+def run_bytes(data: Buffer, window: int = WINDOW) -> int:
+    """
+    Evaluate the dump straight from its bytes, with no instruction objects,
+    one window at a time so only a window's worth is ever copied. Every token
+    ends at its only ")", so a window that ends just after one never cuts a
+    token in two. Toggles are found with plain substring searches, then one
+    regex pass over the window's enabled stretches pulls out the operands and
+    the products are summed without any per-mul Python code.
+    """
+    numbers = NumberCache()
+    total = 0
+    enabled = True
+    pos = 0
+    while pos < len(data):
+        end = data.find(b")", pos + window)
+        end = len(data) if end == -1 else end + 1
+        stretches, enabled = enabled_stretches(data[pos:end], enabled)
+        pos = end
+        # a gap between stretches must not let a mul run across it
+        total += sum_products(MUL_OPERANDS.findall(b" ".join(stretches)), numbers)
+    return total
+
+
+@dataclass
+class ChunkSummary:
+    """
+    What a chunk adds to the total if it starts enabled or disabled, and the
+    state the last toggle in it leaves behind (None if it has no toggles)
+    """
+
+    enabled_total: int = 0
+    disabled_total: int = 0
+    final_toggle: bool | None = None
+
+
+def summarize_chunk(filename: str, start: int, end: int) -> ChunkSummary:
+    """
+    Summarize the tokens that start in [start, end). Every token ends at its
+    only ")", so one that runs past the end of the chunk finishes at the first
+    ")" after it.
+    """
+    summary = ChunkSummary()
+    if_enabled = True
+    if_disabled = False
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            stop = data.find(b")", end)
+            stop = len(data) if stop == -1 else stop + 1
+            for match in PARSER_BYTES.finditer(data, start, stop):
+                if match.start() >= end:
+                    break
+                if match.group(1) is None:
+                    summary.final_toggle = match.end() - match.start() == len(b"do()")
+                    if_enabled = if_disabled = summary.final_toggle
+                    continue
+                product = int(match.group(1)) * int(match.group(2))
+                if if_enabled:
+                    summary.enabled_total += product
+                if if_disabled:
+                    summary.disabled_total += product
+    return summary
+
+
+def combine_summaries(summaries: Iterable[ChunkSummary]) -> int:
+    total = 0
+    enabled = True
+    for summary in summaries:
+        total += summary.enabled_total if enabled else summary.disabled_total
+        if summary.final_toggle is not None:
+            enabled = summary.final_toggle
+    return total
+
+
+def run_parallel(filename: str, workers: int) -> int:
+    size = os.path.getsize(filename)
+    bounds = [size * i // workers for i in range(workers + 1)]
+    ranges = [(start, end) for start, end in zip(bounds, bounds[1:]) if start < end]
+    with ProcessPoolExecutor(workers) as pool:
+        summaries = pool.map(
+            summarize_chunk,
+            [filename] * len(ranges),
+            [start for start, _ in ranges],
+            [end for _, end in ranges],
+        )
+        return combine_summaries(summaries)
+
+
 def main() -> None:
-    instructions: list[Instruction] = []
-    with open(sys.argv[1]) as f:
-        for line in f.readlines():
-            results = parse_line(line)
-            instructions.extend(results)
-    total = run_program(instructions)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--fused",
+        action="store_true",
+        help="evaluate straight from the mapped bytes, without instruction objects",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="summarize chunks of the file in parallel"
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers is not None:
+        print(run_parallel(args.filename, args.workers))
+        return
+    if args.fused:
+        with open(args.filename, "rb") as f:
+            try:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # can't map an empty file
+                print(0)
+                return
+            with data:
+                print(run_bytes(data))
+        return
+    with open(args.filename) as f:
+        # the enabled flag lives in the one State, so it carries across chunks
+        total = run_program(parse_stream(f))
     print(total)
 
 
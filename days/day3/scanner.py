@@ -0,0 +1,42 @@
+import re
+from typing import Iterator, TextIO
+
+CHUNK_SIZE = 1 << 20
+
+# every prefix of mul(x,y), do() and don't() that could still finish in the
+# next chunk
+PARTIAL_TOKEN = re.compile(
+    r"m|mu|mul|mul\(\d*|mul\(\d+,\d*|d|do|do\(|don|don'|don't|don't\("
+)
+
+
+def unfinished_token(buf: str, pos: int) -> str:
+    """
+    Return the tail of buf that might be the start of a token cut off by the
+    end of the chunk. m and d only ever appear as the first letter of a token,
+    so that can only start at the last m or d.
+    """
+    start = max(buf.rfind("m", pos), buf.rfind("d", pos))
+    if start == -1:
+        return ""
+    tail = buf[start:]
+    if PARTIAL_TOKEN.fullmatch(tail):
+        return tail
+    return ""
+
+
+def iter_matches(
+    f: TextIO, pattern: re.Pattern, chunk_size: int = CHUNK_SIZE
+) -> Iterator[re.Match]:
+    """
+    Scan the file a chunk at a time, carrying any half-read token over into
+    the next chunk
+    """
+    carry = ""
+    while chunk := f.read(chunk_size):
+        buf = carry + chunk
+        end = 0
+        for match in pattern.finditer(buf):
+            yield match
+            end = match.end()
+        carry = unfinished_token(buf, end)
@@ -0,0 +1,55 @@
+from collections import Counter, deque
+from typing import Iterable
+
+
+class WordAutomaton:
+    """
+    An Aho-Corasick automaton. Each pattern reports a match against the word
+    it counts towards, so a word and its reverse can both count for the word.
+    """
+
+    def __init__(self, patterns: Iterable[tuple[str, str]]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[list[str]] = [[]]
+        for pattern, word in patterns:
+            self.add(pattern, word)
+        self.link()
+
+    def add(self, pattern: str, word: str) -> None:
+        if not pattern:
+            raise ValueError("can't search for an empty word")
+        state = 0
+        for letter in pattern:
+            if letter not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+                self.goto[state][letter] = len(self.goto) - 1
+            state = self.goto[state][letter]
+        self.outputs[state].append(word)
+
+    def link(self) -> None:
+        """
+        Fill in the failure links breadth-first, so every state also reports
+        the patterns that end in its longest proper suffix
+        """
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for letter, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and letter not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(letter, 0)
+                self.outputs[child] += self.outputs[self.fail[child]]
+                queue.append(child)
+
+    def count(self, text: str, counts: Counter) -> None:
+        state = 0
+        for letter in text:
+            while state and letter not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(letter, 0)
+            for word in self.outputs[state]:
+                counts[word] += 1
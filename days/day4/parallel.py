@@ -0,0 +1,101 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable
+
+DIRECTIONS = [(dx, dy) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dx or dy]
+M, A, S = (ord(letter) for letter in "MAS")
+
+
+def count_word_in_band(
+    name: str, height: int, width: int, y0: int, y1: int, word: bytes
+) -> int:
+    """
+    Count the words that start in rows [y0, y1). They can run up to
+    len(word) - 1 rows past either edge of the band into its halo, which
+    every worker reads straight out of the shared board.
+
+    Each row becomes one int per letter of the word, with byte x set to 1
+    where that letter sits, so a whole row of starts is checked per direction
+    with a few shifts and ANDs instead of cell by cell.
+    """
+    reach = len(word) - 1
+    tables = {letter: bytes(int(i == letter) for i in range(256)) for letter in word}
+    masks: dict[int, dict[int, int]] = {}
+    board = shared_memory.SharedMemory(name=name)
+    try:
+        for y in range(max(0, y0 - reach), min(height, y1 + reach)):
+            row = bytes(board.buf[y * width : (y + 1) * width])
+            masks[y] = {
+                letter: int.from_bytes(row.translate(table), "little")
+                for letter, table in tables.items()
+            }
+    finally:
+        board.close()
+    total = 0
+    for y in range(y0, y1):
+        for dx, dy in DIRECTIONS:
+            if not 0 <= y + reach * dy < height:
+                continue
+            found = masks[y][word[0]]
+            for k in range(1, len(word)):
+                # line the k-th letter's cells up with the starts they belong to
+                shift = 8 * k * dx
+                letter = masks[y + k * dy][word[k]]
+                found &= letter >> shift if shift >= 0 else letter << -shift
+                if not found:
+                    break
+            total += found.bit_count()
+    return total
+
+
+def count_x_mas_in_band(name: str, height: int, width: int, y0: int, y1: int) -> int:
+    """
+    Count the X-MASes centered in rows [y0, y1), reading one row of halo on
+    either side
+    """
+    board = shared_memory.SharedMemory(name=name)
+    letters = board.buf
+    total = 0
+    try:
+        for y in range(max(y0, 1), min(y1, height - 1)):
+            for x in range(1, width - 1):
+                if letters[y * width + x] != A:
+                    continue
+                upper, lower = (y - 1) * width, (y + 1) * width
+                negative = {letters[upper + x - 1], letters[lower + x + 1]}
+                positive = {letters[upper + x + 1], letters[lower + x - 1]}
+                if negative == positive == {M, S}:
+                    total += 1
+    finally:
+        del letters
+        board.close()
+    return total
+
+
+def count_in_bands(
+    lines: list[str], workers: int, count_band: Callable[..., int], *args: Any
+) -> int:
+    """
+    Put the board in shared memory once and hand each worker a band of rows
+    to count
+    """
+    height = len(lines)
+    width = max((len(line) for line in lines), default=0)
+    if not width:
+        return 0
+    # short rows are padded with zero bytes, which never match a letter
+    data = "".join(line.ljust(width, "\0") for line in lines).encode()
+    board = shared_memory.SharedMemory(create=True, size=len(data))
+    try:
+        board.buf[: len(data)] = data
+        bounds = [height * i // workers for i in range(workers + 1)]
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [
+                pool.submit(count_band, board.name, height, width, y0, y1, *args)
+                for y0, y1 in zip(bounds, bounds[1:])
+                if y0 < y1
+            ]
+            return sum(future.result() for future in futures)
+    finally:
+        board.close()
+        board.unlink()
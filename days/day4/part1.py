@@ -1,8 +1,13 @@
-import sys
-
+import argparse
 import dataclasses
+from collections import Counter, deque
+from typing import Iterable, Iterator
+
+from automaton import WordAutomaton
 
 KEY_WORD = "XMAS"
+# stands in for the cells missing from short rows
+GAP = "\0"
 
 
 @dataclasses.dataclass
@@ -23,7 +28,38 @@ class Board:
                 directions.append(Direction(x, y))
 
     def __init__(self, lines: list[list[str]]):
-        self.board = lines
+        self.board = [list(line) for line in lines]
+        self._total: int | None = None
+
+    @property
+    def total(self) -> int:
+        if self._total is None:
+            self._total = self.count_all_matches()
+        return self._total
+
+    def set_letter(self, x: int, y: int, letter: str) -> None:
+        """
+        Change one letter, and keep the total up to date by only re-checking
+        the words that could pass through it
+        """
+        if not (0 <= y < len(self.board) and 0 <= x < len(self.board[y])):
+            raise IndexError(f"({x}, {y}) is off the board")
+        before = self.count_matches_through(x, y)
+        self.board[y][x] = letter
+        if self._total is not None:
+            self._total += self.count_matches_through(x, y) - before
+
+    def count_matches_through(self, x: int, y: int) -> int:
+        """
+        Count the XMASes that use the given cell. Along each direction, the word
+        can start up to len(KEY_WORD) - 1 steps behind it.
+        """
+        total = 0
+        for direction in self.directions:
+            for k in range(len(KEY_WORD)):
+                if self.is_match(x - k * direction.x, y - k * direction.y, direction):
+                    total += 1
+        return total
 
     def count_all_matches(self) -> int:
         total = 0
@@ -34,6 +70,46 @@ class Board:
                     total += self.count_matches_from(x, y)
         return total
 
+    def count_words(self, words: Iterable[str]) -> dict[str, int]:
+        """
+        Count every word in all 8 directions in one pass over each line of the
+        board. Each word goes into the automaton forwards and backwards, so a
+        palindrome counts twice, just like reading it both ways with is_match.
+        """
+        words = list(dict.fromkeys(words))
+        automaton = WordAutomaton(
+            [(word, word) for word in words] + [(word[::-1], word) for word in words]
+        )
+        counts = Counter({word: 0 for word in words})
+        for line in self.lines():
+            automaton.count(line, counts)
+        return dict(counts)
+
+    def lines(self) -> Iterator[str]:
+        """
+        Every row, column, and diagonal of the board, read one way. Cells past
+        the end of a short row read as GAP, so no word runs across them.
+        """
+        height = len(self.board)
+        width = max((len(row) for row in self.board), default=0)
+
+        def cell(x: int, y: int) -> str:
+            row = self.board[y]
+            return row[x] if x < len(row) else GAP
+
+        for row in self.board:
+            yield "".join(row)
+        for x in range(width):
+            yield "".join(cell(x, y) for y in range(height))
+        # diagonals (\) where x - y is constant
+        for d in range(1 - height, width):
+            ys = range(max(0, -d), min(height, width - d))
+            yield "".join(cell(y + d, y) for y in ys)
+        # diagonals (/) where x + y is constant
+        for s in range(height + width - 1):
+            ys = range(max(0, s - width + 1), min(height, s + 1))
+            yield "".join(cell(s - y, y) for y in ys)
+
     def count_matches_from(self, x, y) -> int:
         """
         Given an X, count the ways it can spell XMAS
@@ -59,12 +135,89 @@ class Board:
         return True
 
 
+class StreamingBoard:
+    """
+    Count XMASes while only holding the last len(KEY_WORD) rows. Each match is
+    counted once, when the lowest row it touches arrives.
+    """
+
+    def __init__(self) -> None:
+        self.rows: deque[str] = deque(maxlen=len(KEY_WORD))
+        self.total = 0
+
+    def push(self, row: str) -> None:
+        self.rows.append(row)
+        bottom = len(self.rows) - 1
+        for direction in Board.directions:
+            # downward matches have to start on the top row to end on this one,
+            # everything else has to start on this one
+            y = 0 if direction.y > 0 else bottom
+            if direction.y > 0 and len(self.rows) < len(KEY_WORD):
+                continue
+            start = self.rows[y]
+            x = start.find(KEY_WORD[0])
+            while x != -1:
+                if self.is_match(x, y, direction):
+                    self.total += 1
+                x = start.find(KEY_WORD[0], x + 1)
+
+    def is_match(self, x: int, y: int, direction: Direction) -> bool:
+        """
+        Board.is_match over the held rows, which are indexed as strings
+        """
+        for letter in KEY_WORD:
+            if not (0 <= y < len(self.rows) and 0 <= x < len(self.rows[y])):
+                return False
+            if self.rows[y][x] != letter:
+                return False
+            x += direction.x
+            y += direction.y
+        return True
+
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--words", nargs="+", help="count these words instead")
+    parser.add_argument("--numpy", action="store_true", help="use the numpy engine")
+    parser.add_argument(
+        "--workers", type=int, help="count bands of rows in this many processes"
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="only hold a few rows in memory"
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.stream:
+        streaming_board = StreamingBoard()
+        with open(args.filename) as f:
+            for l in f:
+                streaming_board.push(l.strip())
+        print(streaming_board.total)
+        return
     lines: list[list[str]] = []
-    with open(sys.argv[1]) as f:
+    with open(args.filename) as f:
         for l in f.readlines():
             lines.append(l.strip())
+    if args.workers is not None:
+        import parallel
+
+        count_band = parallel.count_word_in_band
+        print(
+            parallel.count_in_bands(lines, args.workers, count_band, KEY_WORD.encode())
+        )
+        return
+    if args.numpy:
+        import vectorized
+
+        print(vectorized.count_word(vectorized.load_board(lines), KEY_WORD))
+        return
     board = Board(lines)
+    if args.words:
+        for word, count in board.count_words(args.words).items():
+            print(f"{word}: {count}")
+        return
     print(board.count_all_matches())
 
 
@@ -1,9 +1,47 @@
-import sys
+import argparse
+import itertools
+from collections import Counter, deque
+from typing import Sequence
+
+from stencil import Stencil, anchor_tables, compile_patterns
 
 
 class Board:
     def __init__(self, lines: list[list[str]]):
-        self.board = lines
+        self.board = [list(line) for line in lines]
+        self._total: int | None = None
+
+    @property
+    def total(self) -> int:
+        if self._total is None:
+            self._total = self.count_all_matches()
+        return self._total
+
+    def set_letter(self, x: int, y: int, letter: str) -> None:
+        """
+        Change one letter, and keep the total up to date by only re-checking
+        the X-MASes it could be part of
+        """
+        if not (0 <= y < len(self.board) and 0 <= x < len(self.board[y])):
+            raise IndexError(f"({x}, {y}) is off the board")
+        before = self.count_matches_through(x, y)
+        self.board[y][x] = letter
+        if self._total is not None:
+            self._total += self.count_matches_through(x, y) - before
+
+    def count_matches_through(self, x: int, y: int) -> int:
+        """
+        Count the X-MASes that use the given cell, either as the A in the middle
+        or as one of the 4 corners
+        """
+        total = 0
+        for dx, dy in ((0, 0), (-1, -1), (1, -1), (-1, 1), (1, 1)):
+            cx, cy = x + dx, y + dy
+            if not (0 <= cy < len(self.board) and 0 <= cx < len(self.board[cy])):
+                continue
+            if self.board[cy][cx] == "A":
+                total += self.count_matches_from(cx, cy)
+        return total
 
     def count_all_matches(self) -> int:
         total = 0
@@ -20,27 +58,109 @@ class Board:
             return 1
         return 0
 
+    def letter_counts(self) -> Counter:
+        return Counter(itertools.chain.from_iterable(self.board))
+
+    def count_stencil_matches(self, stencils: list[Stencil]) -> int:
+        tables = anchor_tables(stencils)
+        total = 0
+        for y, row in enumerate(self.board):
+            for x, letter in enumerate(row):
+                table = tables.get(letter)
+                if table is not None:
+                    total += table.count_at(self.board, x, y)
+        return total
+
     def is_match(self, x: int, y: int) -> bool:
-        # check if we'll stay in bounds
-        if any((x < 1, y < 1, y + 1 >= len(self.board), x + 1 >= len(self.board[y]))):
+        if y < 1 or y + 1 >= len(self.board):
             return False
+        return is_x_mas(self.board[y - 1], self.board[y], self.board[y + 1], x)
+
+
+def is_x_mas(
+    upper: Sequence[str], middle: Sequence[str], lower: Sequence[str], x: int
+) -> bool:
+    """
+    Check the corners around x of the middle row for an X-MAS. Rows can be
+    lists or strings, and any of them can be shorter than the others.
+    """
+    # check if we'll stay in bounds
+    if x < 1 or x + 1 >= min(len(upper), len(middle), len(lower)):
+        return False
+    negative = {upper[x - 1], lower[x + 1]}  # letters on the negative slope (\)
+    positive = {upper[x + 1], lower[x - 1]}  # letters on the positive slope (/)
+    return negative == positive == {"M", "S"}
 
-        negative = []  # letters on the negative slope (\)
-        negative.append(self.board[y - 1][x - 1])
-        negative.append(self.board[y + 1][x + 1])
 
-        positive = []  # letters on the positive slope (/)
-        positive.append(self.board[y - 1][x + 1])
-        positive.append(self.board[y + 1][x - 1])
-        return sorted(negative) == ["M", "S"] and sorted(positive) == ["M", "S"]
+class StreamingBoard:
+    """
+    Count X-MASes while only holding the last 3 rows. Each one is counted when
+    its bottom row arrives.
+    """
+
+    def __init__(self) -> None:
+        self.rows: deque[str] = deque(maxlen=3)
+        self.total = 0
+
+    def push(self, row: str) -> None:
+        self.rows.append(row)
+        if len(self.rows) < 3:
+            return
+        upper, middle, lower = self.rows
+        x = middle.find("A")
+        while x != -1:
+            if is_x_mas(upper, middle, lower, x):
+                self.total += 1
+            x = middle.find("A", x + 1)
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--numpy", action="store_true", help="use the numpy engine")
+    parser.add_argument(
+        "--workers", type=int, help="count bands of rows in this many processes"
+    )
+    parser.add_argument(
+        "--stream", action="store_true", help="only hold a few rows in memory"
+    )
+    parser.add_argument(
+        "--pattern",
+        action="append",
+        help="count this shape instead, rows split by / and . as a wildcard, "
+        "e.g. M.S/.A./M.S; rotations and mirror images count too",
+    )
+    args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.stream:
+        streaming_board = StreamingBoard()
+        with open(args.filename) as f:
+            for l in f:
+                streaming_board.push(l.strip())
+        print(streaming_board.total)
+        return
     lines: list[list[str]] = []
-    with open(sys.argv[1]) as f:
+    with open(args.filename) as f:
         for l in f.readlines():
             lines.append(l.strip())
+    if args.workers is not None:
+        import parallel
+
+        count_band = parallel.count_x_mas_in_band
+        print(parallel.count_in_bands(lines, args.workers, count_band))
+        return
+    if args.numpy:
+        import vectorized
+
+        print(vectorized.count_x_mas(vectorized.load_board(lines)))
+        return
     board = Board(lines)
+    if args.pattern:
+        patterns = [pattern.split("/") for pattern in args.pattern]
+        stencils = compile_patterns(patterns, board.letter_counts())
+        print(board.count_stencil_matches(stencils))
+        return
     print(board.count_all_matches())
 
 
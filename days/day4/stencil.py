@@ -0,0 +1,156 @@
+import dataclasses
+from collections import Counter
+from typing import Iterable, TypeAlias
+
+WILDCARD = "."
+
+# (x, y, letter)
+Cell: TypeAlias = tuple[int, int, str]
+
+
+@dataclasses.dataclass(frozen=True)
+class Stencil:
+    """
+    A compiled shape. The first cell is the anchor and sits at (0, 0); the
+    rest are offsets from it, in the order they should be checked.
+    """
+
+    anchor: str
+    cells: tuple[Cell, ...]
+
+    @classmethod
+    def from_cells(cls, cells: list[Cell]) -> "Stencil":
+        ax, ay, anchor = cells[0]
+        offsets = tuple((x - ax, y - ay, letter) for x, y, letter in cells[1:])
+        return cls(anchor, offsets)
+
+
+Offset: TypeAlias = tuple[int, int]
+
+
+@dataclasses.dataclass
+class AnchorTable:
+    """
+    Every stencil that shares an anchor letter, matched bit-parallel: bit i of
+    a mask stands for stencil i. For each offset any of them checks, free has
+    the stencils that don't care what's there and compatible maps a letter to
+    the ones it keeps alive. A lookup ands those together one offset at a
+    time, so it costs one read per distinct offset, however many stencils
+    share them, and usually stops after the first read or two.
+    """
+
+    everything: int
+    offsets: list[Offset]
+    compatible: list[dict[str, int]]
+    free: list[int]
+    # pending[k]: the stencils that still check something at offsets[k:]
+    pending: list[int]
+
+    @classmethod
+    def build(cls, stencils: list[Stencil]) -> "AnchorTable":
+        wants: dict[Offset, dict[int, str]] = {}
+        rank: dict[Offset, int] = {}
+        for i, stencil in enumerate(stencils):
+            for j, (dx, dy, letter) in enumerate(stencil.cells):
+                wants.setdefault((dx, dy), {})[i] = letter
+                rank[dx, dy] = min(rank.get((dx, dy), j), j)
+        # stencils list their rarest letters first, and an offset more of them
+        # check rules out more of them at once
+        offsets = sorted(wants, key=lambda offset: (rank[offset], -len(wants[offset])))
+        everything = (1 << len(stencils)) - 1
+        compatible = []
+        free = []
+        for offset in offsets:
+            by_letter: dict[str, int] = {}
+            for i, letter in wants[offset].items():
+                by_letter[letter] = by_letter.get(letter, 0) | 1 << i
+            unconstrained = everything
+            for bits in by_letter.values():
+                unconstrained &= ~bits
+            free.append(unconstrained)
+            compatible.append(
+                {letter: bits | unconstrained for letter, bits in by_letter.items()}
+            )
+        pending = [0] * len(offsets)
+        later = 0
+        for k in reversed(range(len(offsets))):
+            later |= everything & ~free[k]
+            pending[k] = later
+        return cls(everything, offsets, compatible, free, pending)
+
+    def count_at(self, board: list[list[str]], x: int, y: int) -> int:
+        alive = self.everything
+        for k, (dx, dy) in enumerate(self.offsets):
+            if not alive & self.pending[k]:
+                break
+            cx = x + dx
+            cy = y + dy
+            if 0 <= cy < len(board) and 0 <= cx < len(board[cy]):
+                alive &= self.compatible[k].get(board[cy][cx], self.free[k])
+            else:
+                alive &= self.free[k]
+        return alive.bit_count()
+
+
+def anchor_tables(stencils: Iterable[Stencil]) -> dict[str, AnchorTable]:
+    by_anchor: dict[str, list[Stencil]] = {}
+    for stencil in stencils:
+        by_anchor.setdefault(stencil.anchor, []).append(stencil)
+    return {anchor: AnchorTable.build(group) for anchor, group in by_anchor.items()}
+
+
+def parse_pattern(rows: Iterable[str]) -> frozenset[Cell]:
+    return frozenset(
+        (x, y, letter)
+        for y, row in enumerate(rows)
+        for x, letter in enumerate(row)
+        if letter != WILDCARD
+    )
+
+
+def normalize(cells: Iterable[Cell]) -> frozenset[Cell]:
+    cells = list(cells)
+    min_x = min(x for x, _, _ in cells)
+    min_y = min(y for _, y, _ in cells)
+    return frozenset((x - min_x, y - min_y, letter) for x, y, letter in cells)
+
+
+def variants(
+    cells: frozenset[Cell], rotate: bool = True, mirror: bool = True
+) -> set[frozenset[Cell]]:
+    """
+    Every distinct orientation of the shape. Symmetric shapes collapse into
+    fewer variants, so they aren't counted more than once.
+    """
+    shapes = [cells]
+    if mirror:
+        shapes.append(frozenset((-x, y, letter) for x, y, letter in cells))
+    found = set()
+    for shape in shapes:
+        for _ in range(4 if rotate else 1):
+            found.add(normalize(shape))
+            shape = frozenset((-y, x, letter) for x, y, letter in shape)
+    return found
+
+
+def compile_patterns(
+    patterns: Iterable[Iterable[str]],
+    letter_counts: Counter,
+    rotate: bool = True,
+    mirror: bool = True,
+) -> list[Stencil]:
+    """
+    Turn pattern specs into stencils whose cells are checked rarest letter
+    first, so most anchors are ruled out on the first lookup
+    """
+    stencils = []
+    for pattern in patterns:
+        cells = parse_pattern(pattern)
+        if not cells:
+            raise ValueError("a pattern needs at least one letter")
+        for variant in variants(cells, rotate, mirror):
+            ordered = sorted(
+                variant, key=lambda cell: (letter_counts[cell[2]], cell[1], cell[0])
+            )
+            stencils.append(Stencil.from_cells(ordered))
+    return stencils
@@ -0,0 +1,55 @@
+import numpy as np
+
+M, A, S = (ord(letter) for letter in "MAS")
+
+
+def load_board(lines: list[str]) -> np.ndarray:
+    """
+    One byte per cell. Short rows are padded with zero bytes, which never match
+    a letter, so ragged and blank rows count the same as they do in Board.
+    """
+    if not lines:
+        return np.zeros((0, 0), dtype=np.uint8)
+    width = max(len(line) for line in lines)
+    padded = "".join(line.ljust(width, "\0") for line in lines)
+    return np.frombuffer(padded.encode(), dtype=np.uint8).reshape(len(lines), width)
+
+
+def count_word(board: np.ndarray, word: str) -> int:
+    """
+    For each direction, AND together one shifted equality mask per letter, so
+    a cell stays set only if the whole word starts there
+    """
+    height, width = board.shape
+    reach = len(word) - 1
+    total = 0
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            if dx == 0 and dy == 0:
+                continue
+            # the origins that keep the whole word on the board
+            y0, y1 = max(0, -reach * dy), height - max(0, reach * dy)
+            x0, x1 = max(0, -reach * dx), width - max(0, reach * dx)
+            if y0 >= y1 or x0 >= x1:
+                continue
+            mask = np.ones((y1 - y0, x1 - x0), dtype=bool)
+            for k, letter in enumerate(word):
+                shifted = board[y0 + k * dy : y1 + k * dy, x0 + k * dx : x1 + k * dx]
+                mask &= shifted == ord(letter)
+            total += int(mask.sum())
+    return total
+
+
+def count_x_mas(board: np.ndarray) -> int:
+    if board.shape[0] < 3 or board.shape[1] < 3:
+        return 0
+    centers = board[1:-1, 1:-1] == A
+    upper_left, lower_right = board[:-2, :-2], board[2:, 2:]
+    upper_right, lower_left = board[:-2, 2:], board[2:, :-2]
+    negative = ((upper_left == M) & (lower_right == S)) | (
+        (upper_left == S) & (lower_right == M)
+    )
+    positive = ((upper_right == M) & (lower_left == S)) | (
+        (upper_right == S) & (lower_left == M)
+    )
+    return int((centers & negative & positive).sum())
@@ -0,0 +1,108 @@
+import sys
+from dataclasses import dataclass
+
+from part1 import PageNumber, RuleIndex, iter_bits, load_rules
+
+
+def strongly_connected_components(rules: RuleIndex) -> list[list[int]]:
+    """
+    Tarjan's algorithm, without recursion. Components come out in reverse
+    topological order: nothing in a component points at a later one.
+    """
+    count = len(rules.pages)
+    index = [-1] * count
+    low = [0] * count
+    on_stack = [False] * count
+    stack: list[int] = []
+    components: list[list[int]] = []
+    counter = 0
+    for root in range(count):
+        if index[root] != -1:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        work = [(root, iter_bits(rules.successors[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if index[child] == -1:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = True
+                    work.append((child, iter_bits(rules.successors[child])))
+                    break
+                if on_stack[child]:
+                    low[node] = min(low[node], index[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+@dataclass
+class ClosureIndex:
+    """
+    The transitive closure of the rules. reach[c] is a bitset over page ids
+    of everything the pages in component c must come before, directly or
+    through other rules.
+    """
+
+    rules: RuleIndex
+    component_of: list[int]
+    reach: list[int]
+    cycles: list[list[PageNumber]]
+
+    @classmethod
+    def from_rules(cls, rules: RuleIndex) -> "ClosureIndex":
+        components = strongly_connected_components(rules)
+        component_of = [0] * len(rules.pages)
+        for c, members in enumerate(components):
+            for member in members:
+                component_of[member] = c
+        reach = [0] * len(components)
+        cycles: list[list[PageNumber]] = []
+        # every component a component points at was finished before it
+        for c, members in enumerate(components):
+            bits = 0
+            for member in members:
+                for later in iter_bits(rules.successors[member]):
+                    bits |= 1 << later
+                    if component_of[later] != c:
+                        bits |= reach[component_of[later]]
+            reach[c] = bits
+            if len(members) > 1 or rules.successors[members[0]] >> members[0] & 1:
+                cycles.append(sorted(rules.pages[member] for member in members))
+        return cls(rules, component_of, reach, cycles)
+
+    def must_precede(self, first: PageNumber, second: PageNumber) -> bool:
+        if first not in self.rules.ids or second not in self.rules.ids:
+            return False
+        first_id = self.rules.ids[first]
+        second_id = self.rules.ids[second]
+        return bool(self.reach[self.component_of[first_id]] >> second_id & 1)
+
+
+def main():
+    rules, _ = load_rules(sys.argv[1])
+    closure = ClosureIndex.from_rules(rules)
+    for cycle in closure.cycles:
+        print(f"cycle between pages {cycle}")
+    print(f"{len(closure.cycles)} cycles")
+
+
+if __name__ == "__main__":
+    main()
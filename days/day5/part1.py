@@ -1,13 +1,67 @@
 import sys
-from typing import TypeAlias
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, TypeAlias
 
 PageNumber: TypeAlias = int
 ManualRequest: TypeAlias = list[PageNumber]
-RuleSet: TypeAlias = dict[PageNumber, set[PageNumber]]
 
 
-def load_rules(filename) -> tuple[RuleSet, list[ManualRequest]]:
-    rules: RuleSet = {}
+@dataclass
+class RuleIndex:
+    """
+    Every page in a rule gets a dense id. successors[id] and predecessors[id]
+    are bitsets over those ids: the pages that page must come before, and the
+    pages that must come before it.
+    """
+
+    ids: dict[PageNumber, int] = field(default_factory=dict)
+    pages: list[PageNumber] = field(default_factory=list)
+    successors: list[int] = field(default_factory=list)
+    predecessors: list[int] = field(default_factory=list)
+
+    def id_for(self, page: PageNumber) -> int:
+        if page not in self.ids:
+            self.ids[page] = len(self.pages)
+            self.pages.append(page)
+            self.successors.append(0)
+            self.predecessors.append(0)
+        return self.ids[page]
+
+    def add(self, first: PageNumber, second: PageNumber) -> None:
+        first_id = self.id_for(first)
+        second_id = self.id_for(second)
+        self.successors[first_id] |= 1 << second_id
+        self.predecessors[second_id] |= 1 << first_id
+
+    def remove(self, first: PageNumber, second: PageNumber) -> None:
+        if first in self.ids and second in self.ids:
+            first_id = self.ids[first]
+            second_id = self.ids[second]
+            self.successors[first_id] &= ~(1 << second_id)
+            self.predecessors[second_id] &= ~(1 << first_id)
+
+    def has(self, first: PageNumber, second: PageNumber) -> bool:
+        if first not in self.ids or second not in self.ids:
+            return False
+        return bool(self.successors[self.ids[first]] >> self.ids[second] & 1)
+
+    def bits_for(self, pages: Iterable[PageNumber]) -> int:
+        bits = 0
+        for page in pages:
+            if page in self.ids:
+                bits |= 1 << self.ids[page]
+        return bits
+
+
+def iter_bits(bits: int) -> Iterator[int]:
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def load_rules(filename) -> tuple[RuleIndex, list[ManualRequest]]:
+    rules = RuleIndex()
     manuals: list[ManualRequest] = []
     with open(filename) as f:
         for line in f.readlines():
@@ -15,26 +69,27 @@ def load_rules(filename) -> tuple[RuleSet, list[ManualRequest]]:
             if "|" in line:
 
                 first_str, _, second_str = line.partition("|")
-                first = int(first_str)
-                second = int(second_str)
-                rule = rules.get(first, set())
-                rule.add(second)
-                rules[first] = rule
+                rules.add(int(first_str), int(second_str))
             elif "," in line:
                 page_numbers = [int(el) for el in line.split(",")]
                 manuals.append(page_numbers)
     return rules, manuals
 
 
-def check_manual(manual: ManualRequest, rules: RuleSet) -> bool:
-    seen: set[PageNumber] = set()
-    for page in manual:
-        if page in rules:
-            page_rules = rules[page]
-            intersection = page_rules & seen
-            if len(intersection):
+def check_manual(manual: ManualRequest, rules: RuleIndex) -> bool:
+    """
+    Map each of the manual's pages to its position once, then check that
+    every page in the manual it must come before sits after it
+    """
+    positions: dict[int, int] = {}
+    for i, page in enumerate(manual):
+        if page in rules.ids:
+            positions[rules.ids[page]] = i
+    in_manual = rules.bits_for(manual)
+    for page_id, i in positions.items():
+        for later_id in iter_bits(rules.successors[page_id] & in_manual):
+            if positions[later_id] < i:
                 return False
-        seen.add(page)
     return True
 
 
@@ -1,60 +1,77 @@
+import heapq
 import sys
-from typing import TypeAlias
 
-
-class PageNumber:
-    def __init__(self, number: int) -> None:
-        self.number: int = number
-        self.must_be_before = set()
-
-    def add(self, number: int) -> None:
-        self.must_be_before.add(number)
-
-    def __lt__(self, other) -> bool:
-        if other.number in self.must_be_before:
-            return True
-
-    def __hash__(self):
-        return hash(self.number)
-
-
-ManualRequest: TypeAlias = list[PageNumber]
-RuleSet: TypeAlias = dict[int, PageNumber]
-
-
-def load_rules(filename) -> tuple[RuleSet, list[ManualRequest]]:
-    rules: RuleSet = {}
-    manuals: list[ManualRequest] = []
-    with open(filename) as f:
-        for line in f.readlines():
-            line = line.strip()
-            if "|" in line:
-
-                first_str, _, second_str = line.partition("|")
-                first = int(first_str)
-                second = int(second_str)
-                rule = rules.get(first, PageNumber(first))
-                rule.add(second)
-                rules[first] = rule
-            elif "," in line:
-                manual = []
-                for page_number_str in line.split(","):
-                    page_number = int(page_number_str)
-                    manual.append(rules.get(page_number, PageNumber(page_number)))
-                manuals.append(manual)
-    return rules, manuals
-
-
-def check_manual(manual: ManualRequest, rules: RuleSet) -> bool:
-    return sorted(manual) == manual
-
-
-def sort_manual(manual: ManualRequest, rules: RuleSet) -> ManualRequest:
-    return sorted(manual)
-
-
-def middle_page(manual: ManualRequest) -> int:
-    return manual[len(manual) // 2].number
+from part1 import (
+    ManualRequest,
+    PageNumber,
+    RuleIndex,
+    check_manual,
+    iter_bits,
+    load_rules,
+)
+
+
+class RuleCycleError(ValueError):
+    pass
+
+
+def sort_manual(manual: ManualRequest, rules: RuleIndex) -> ManualRequest:
+    """
+    Order the manual with Kahn's algorithm, over only the rules between its
+    own pages. When several pages are free to go next, the one that came
+    first in the manual wins, so the result is deterministic and a manual
+    that's already in order comes back unchanged.
+    """
+    positions = {
+        rules.ids[page]: i for i, page in enumerate(manual) if page in rules.ids
+    }
+    in_manual = rules.bits_for(manual)
+    successors: list[list[int]] = [[] for _ in manual]
+    blockers = [0] * len(manual)
+    for page_id, i in positions.items():
+        for later_id in iter_bits(rules.successors[page_id] & in_manual):
+            j = positions[later_id]
+            successors[i].append(j)
+            blockers[j] += 1
+    ready = [i for i, count in enumerate(blockers) if not count]
+    heapq.heapify(ready)
+    ordered: ManualRequest = []
+    while ready:
+        i = heapq.heappop(ready)
+        ordered.append(manual[i])
+        for j in successors[i]:
+            blockers[j] -= 1
+            if not blockers[j]:
+                heapq.heappush(ready, j)
+    if len(ordered) < len(manual):
+        stuck = [page for i, page in enumerate(manual) if blockers[i]]
+        raise RuleCycleError(f"rules form a cycle between pages {stuck}")
+    return ordered
+
+
+def select_page(manual: ManualRequest, rules: RuleIndex, k: int) -> PageNumber:
+    """
+    Find the page at position k of the sorted manual without sorting it.
+
+    When the rules order every pair of the manual's pages one way, a page's
+    position is just how many of the manual's pages must come before it. If
+    they don't, fall back to sorting.
+    """
+    in_manual = rules.bits_for(manual)
+    by_position: dict[int, PageNumber] = {}
+    for page in manual:
+        page_id = rules.ids.get(page)
+        if page_id is None:
+            return sort_manual(manual, rules)[k]
+        before = rules.predecessors[page_id] & in_manual
+        if before & rules.successors[page_id]:
+            return sort_manual(manual, rules)[k]
+        position = before.bit_count()
+        if position in by_position:
+            return sort_manual(manual, rules)[k]
+        by_position[position] = page
+    # n distinct positions below n, so every position is filled
+    return by_position[k]
 
 
 def main():
@@ -62,7 +79,7 @@ def main():
     wrong_manuals = [manual for manual in requests if not check_manual(manual, rules)]
     total = 0
     for manual in wrong_manuals:
-        total += middle_page(sorted(manual))
+        total += select_page(manual, rules, len(manual) // 2)
     print(total)
 
 
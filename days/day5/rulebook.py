@@ -0,0 +1,74 @@
+from collections import defaultdict
+
+from part1 import ManualRequest, PageNumber, RuleIndex, check_manual, load_rules
+from part2 import RuleCycleError, select_page
+
+
+class RuleBook:
+    """
+    Keep the totals of the valid manuals' middle pages and the corrected
+    manuals' middle pages up to date while rules change. A rule only matters
+    to manuals that have both of its pages, so an inverted index from page to
+    manuals picks out the only ones that need checking again.
+    """
+
+    def __init__(self, rules: RuleIndex, manuals: list[ManualRequest]) -> None:
+        self.rules = rules
+        self.manuals = manuals
+        self.manuals_with_page: defaultdict[PageNumber, set[int]] = defaultdict(set)
+        self.valid = [False] * len(manuals)
+        self.middles = [0] * len(manuals)
+        # manuals whose own rules form a cycle, so they can't be corrected
+        self.unorderable: set[int] = set()
+        self.valid_total = 0
+        self.corrected_total = 0
+        for i, manual in enumerate(manuals):
+            for page in manual:
+                self.manuals_with_page[page].add(i)
+            self.evaluate(i)
+
+    @classmethod
+    def from_file(cls, filename: str) -> "RuleBook":
+        return cls(*load_rules(filename))
+
+    def add_rule(self, first: PageNumber, second: PageNumber) -> None:
+        if self.rules.has(first, second):
+            return
+        self.rules.add(first, second)
+        self.recheck(first, second)
+
+    def remove_rule(self, first: PageNumber, second: PageNumber) -> None:
+        if not self.rules.has(first, second):
+            return
+        self.rules.remove(first, second)
+        self.recheck(first, second)
+
+    def recheck(self, first: PageNumber, second: PageNumber) -> None:
+        with_first = self.manuals_with_page.get(first, set())
+        with_second = self.manuals_with_page.get(second, set())
+        for i in with_first & with_second:
+            self.retract(i)
+            self.evaluate(i)
+
+    def retract(self, i: int) -> None:
+        if self.valid[i]:
+            self.valid_total -= self.middles[i]
+        else:
+            self.corrected_total -= self.middles[i]
+        self.middles[i] = 0
+        self.unorderable.discard(i)
+
+    def evaluate(self, i: int) -> None:
+        manual = self.manuals[i]
+        middle = len(manual) // 2
+        self.valid[i] = check_manual(manual, self.rules)
+        if self.valid[i]:
+            self.middles[i] = manual[middle]
+            self.valid_total += self.middles[i]
+            return
+        try:
+            self.middles[i] = select_page(manual, self.rules, middle)
+        except RuleCycleError:
+            self.unorderable.add(i)
+            return
+        self.corrected_total += self.middles[i]
@@ -77,12 +77,7 @@ class Map:
             self.grid[point.y][point.x] = val
 
     def __str__(self) -> str:
-        s = ""
-        for line in self.grid:
-            for point in line:
-                s += point
-            s += "\n"
-        return s
+        return "".join("".join(line) + "\n" for line in self.grid)
 
 
 @dataclasses.dataclass
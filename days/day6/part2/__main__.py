@@ -1,4 +1,4 @@
-import sys
+import argparse
 from typing import TypeAlias, ClassVar
 from dataclasses import dataclass, field
 from collections import deque, defaultdict
@@ -7,22 +7,39 @@ from part2.point import Point
 from part2.heading import Heading
 from part2.vector import Vector
 from part2.floor_map import FloorMap, FloorTile
+from part2.jump_table import JumpTable, turns_along
 
 
 def main():
-    with open(sys.argv[1]) as f:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument(
+        "--tiles",
+        action="store_true",
+        help="check each candidate by walking the floor tile by tile",
+    )
+    args = parser.parse_args()
+    with open(args.filename) as f:
         contents = "".join(f.readlines())
     floor_map = FloorMap.from_str(contents)
+    jump_table = JumpTable.from_floor_map(floor_map)
+    # a second, unwalked copy that each tile-by-tile check rolls back to
+    pristine = FloorMap.from_str(contents) if args.tiles else None
     potential_obstacles = 0
     floor_map.walk_guard_to_end()
-    for y, row in enumerate(floor_map.grid):
-        for x, tile in enumerate(row):
-            if not any((tile.is_guard_starting_point, tile.is_obstacle)):
-                if tile in floor_map.visited_tiles:
-                    test_map = FloorMap.from_str(contents)
-                    test_map.grid[y][x].is_test_obstacle = True
-                    if test_map.walk_guard_to_end_and_check_for_loops():
-                        potential_obstacles += 1
+    path = floor_map.path
+    turns, turn_counts = turns_along(path)
+    # the walk is the same as the recorded one up to just before the obstacle,
+    # so every check is independent and starts from there
+    for location, i in floor_map.resume_points().items():
+        if pristine is not None:
+            loops = pristine.would_loop_with_obstacle(location)
+        else:
+            loops = jump_table.loops(
+                path[i], extra_obstacle=location, seen=turns[: turn_counts[i]]
+            )
+        if loops:
+            potential_obstacles += 1
     print(len(floor_map.visited_tiles))
     print(potential_obstacles)
 
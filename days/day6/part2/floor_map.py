@@ -1,4 +1,3 @@
-import copy
 from dataclasses import dataclass, field
 import itertools
 
@@ -93,6 +92,7 @@ class FloorTile:
             direction = directions_for_str[symbol]
             this.visited_directions.add(direction)
             this.guard = Vector(this.location, direction)
+            this.is_guard_starting_point = True
         return this
 
 
@@ -105,6 +105,11 @@ class FloorMap:
     obstacles: set[FloorTile] = field(default_factory=set)
     potential_loop_obstacles: set[FloorTile] = field(default_factory=set)
     tested_loop_obstacle_vectors: set[Vector] = field(default_factory=set)
+    # the state of every tile touched since the last checkpoint, by location
+    journal: dict[tuple[int, int], tuple] | None = field(default=None, repr=False)
+    checkpoint_guard: Vector | None = field(default=None, repr=False)
+    # every state the guard was in on walk_guard_to_end, turns included
+    path: list[Vector] = field(default_factory=list, repr=False)
 
     @property
     def size(self) -> int:
@@ -122,12 +127,9 @@ class FloorMap:
             self.grid[point.y][point.x] = val
 
     def __str__(self) -> str:
-        s = ""
-        for line in self.grid:
-            for point in line:
-                s += str(point)
-            s += "\n"
-        return s
+        return "".join(
+            "".join(str(point) for point in line) + "\n" for line in self.grid
+        )
 
     @classmethod
     def from_str(cls, blob: str) -> "FloorMap":
@@ -151,11 +153,52 @@ class FloorMap:
         board = cls(tiles, guard, lower_right_bound=p, obstacles=obstacles)
         return board
 
+    def checkpoint(self) -> None:
+        """
+        Start journaling tile changes, so rollback() can undo just the tiles a
+        walk touched instead of re-parsing or copying the whole floor
+        """
+        self.journal = {}
+        self.checkpoint_guard = self.guard
+
+    def touch(self, tile: FloorTile) -> None:
+        key = (tile.location.x, tile.location.y)
+        if self.journal is not None and key not in self.journal:
+            self.journal[key] = (
+                tile,
+                set(tile.visited_directions),
+                tile.guard,
+                tile.is_test_obstacle,
+            )
+
+    def rollback(self) -> None:
+        journal, guard = self.journal, self.checkpoint_guard
+        if journal is None or guard is None:
+            raise RuntimeError("rollback without checkpoint")
+        for tile, visited_directions, tile_guard, is_test_obstacle in journal.values():
+            tile.visited_directions = visited_directions
+            tile.guard = tile_guard
+            tile.is_test_obstacle = is_test_obstacle
+        self.guard = guard
+        self.journal = None
+        self.checkpoint_guard = None
+
+    def would_loop_with_obstacle(self, point: Point) -> bool:
+        self.checkpoint()
+        try:
+            self.touch(self[point])
+            self[point].is_test_obstacle = True
+            return bool(self.walk_guard_to_end_and_check_for_loops())
+        finally:
+            self.rollback()
+
     def advance_guard(self) -> None:
         this_tile = self.guard.origin
         next_tile = self.guard.next_step()
         if not self.contains(next_tile):
             raise IndexError()
+        self.touch(self[this_tile])
+        self.touch(self[next_tile])
         try:
             self[next_tile].visit(self.guard)
             self.guard = Vector(next_tile, self.guard.heading)
@@ -167,16 +210,30 @@ class FloorMap:
         # print(str(self))
 
     def walk_guard_to_end(self) -> None:
+        self.path.append(self.guard)
         while True:
             try:
-                # if self.blank_clone().would_loop_ahead():
+                # if self.would_loop_ahead():
                 #    print("found one")
                 #    self.potential_loop_obstacles.add(self.guard.next_step())
                 # self.tested_loop_obstacle_vectors.add(self.guard)
                 self.advance_guard()
+                self.path.append(self.guard)
             except IndexError:
                 return
 
+    def resume_points(self) -> dict[Point, int]:
+        """
+        For every tile the recorded walk reaches, other than where the guard
+        started, the index in path of the state just before it first steps on it
+        """
+        points: dict[Point, int] = {}
+        for i, state in enumerate(self.path[1:]):
+            if state.origin in points or self[state.origin].is_guard_starting_point:
+                continue
+            points[state.origin] = i
+        return points
+
     def would_loop_ahead(self) -> bool:
         next_step = self[self.guard.next_step()]
         if self.guard in self.tested_loop_obstacle_vectors:
@@ -184,8 +241,7 @@ class FloorMap:
             return False
         if next_step.is_obstacle:
             return False
-        next_step.is_test_obstacle = True
-        return self.walk_guard_to_end_and_check_for_loops()
+        return self.would_loop_with_obstacle(next_step.location)
 
     def walk_guard_to_end_and_check_for_loops(self) -> bool:
         steps = 0
@@ -201,10 +257,6 @@ class FloorMap:
             steps += 1
         print("size exceeded!")
 
-    def blank_clone(self) -> "FloorMap":
-        clone = copy.deepcopy(self)
-        return clone
-
     def contains(self, point: Point) -> bool:
         return point <= self.lower_right_bound and point >= self.upper_left_bound
 
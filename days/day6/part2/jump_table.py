@@ -0,0 +1,113 @@
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterable, TypeAlias
+
+from part2.floor_map import FloorMap
+from part2.point import Point
+from part2.vector import Vector
+
+Turn: TypeAlias = tuple[int, int, int, int]
+
+
+def turns_along(path: list[Vector]) -> tuple[list[Turn], list[int]]:
+    """
+    The turns on a recorded walk, in order, as the (x, y, dx, dy) the guard
+    faces after each one. counts[i] is how many of them happen by path[i].
+    """
+    turns: list[Turn] = []
+    counts: list[int] = []
+    for i, state in enumerate(path):
+        if i and state.origin == path[i - 1].origin:
+            heading = state.heading
+            turns.append((state.origin.x, state.origin.y, heading.x, heading.y))
+        counts.append(len(turns))
+    return turns, counts
+
+
+@dataclass
+class JumpTable:
+    """
+    The sorted positions of the obstacles in every row and column, so the
+    guard can jump straight to the next one instead of walking tile by tile.
+    Positions and headings are plain ints here to keep each jump cheap.
+    """
+
+    width: int
+    height: int
+    obstacles_in_row: list[list[int]]
+    obstacles_in_column: list[list[int]]
+
+    @classmethod
+    def from_floor_map(cls, floor_map: FloorMap) -> "JumpTable":
+        height = len(floor_map.grid)
+        width = len(floor_map.grid[0])
+        rows: list[list[int]] = [[] for _ in range(height)]
+        columns: list[list[int]] = [[] for _ in range(width)]
+        for tile in floor_map.obstacles:
+            rows[tile.location.y].append(tile.location.x)
+            columns[tile.location.x].append(tile.location.y)
+        for line in rows + columns:
+            line.sort()
+        return cls(width, height, rows, columns)
+
+    def next_stop(
+        self, x: int, y: int, dx: int, dy: int, extra: tuple[int, int] | None = None
+    ) -> tuple[int, int] | None:
+        """
+        Where the guard stops walking straight from (x, y): the tile just
+        before the next obstacle, or None if it walks off the floor first.
+        extra is one more obstacle that isn't in the table.
+        """
+        extra_along = None
+        if dy == 0:
+            line, along, fixed, step = self.obstacles_in_row[y], x, y, dx
+            if extra is not None and extra[1] == y:
+                extra_along = extra[0]
+        else:
+            line, along, fixed, step = self.obstacles_in_column[x], y, x, dy
+            if extra is not None and extra[0] == x:
+                extra_along = extra[1]
+        if step > 0:
+            i = bisect_right(line, along)
+            stop = line[i] if i < len(line) else None
+            if extra_along is not None and along < extra_along:
+                if stop is None or extra_along < stop:
+                    stop = extra_along
+        else:
+            i = bisect_left(line, along) - 1
+            stop = line[i] if i >= 0 else None
+            if extra_along is not None and extra_along < along:
+                if stop is None or stop < extra_along:
+                    stop = extra_along
+        if stop is None:
+            return None
+        if dy == 0:
+            return stop - step, fixed
+        return fixed, stop - step
+
+    def loops(
+        self,
+        guard: Vector,
+        extra_obstacle: Point | None = None,
+        seen: Iterable[Turn] = (),
+    ) -> bool:
+        """
+        Walk the guard one straight segment at a time. It's in a loop once it
+        turns at the same tile, facing the same way, twice. seen holds turns
+        it already made before reaching this state.
+        """
+        x, y = guard.origin.x, guard.origin.y
+        dx, dy = guard.heading.x, guard.heading.y
+        extra = None
+        if extra_obstacle is not None:
+            extra = (extra_obstacle.x, extra_obstacle.y)
+        turns: set[Turn] = set(seen)
+        while True:
+            stop = self.next_stop(x, y, dx, dy, extra)
+            if stop is None:
+                return False
+            x, y = stop
+            dx, dy = -dy, dx
+            if (x, y, dx, dy) in turns:
+                return True
+            turns.add((x, y, dx, dy))
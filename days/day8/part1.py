@@ -1,7 +1,14 @@
 from collections import defaultdict
 from dataclasses import dataclass, field
+from typing import Iterator
+import argparse
+import itertools
+import os
 import sys
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from render import render  # noqa: E402
+
 
 @dataclass
 class Point:
@@ -99,12 +106,13 @@ class Grid:
         return point <= self.upper and point >= self.lower
 
     def __str__(self):
-        blob: str = ""
-        for row in self.grid:
-            for point in row:
-                blob += str(point)
-            blob += "\n"
-        return blob
+        return "".join(f"{row}\n" for row in self.rows())
+
+    def rows(
+        self, height: int | None = None, width: int | None = None
+    ) -> Iterator[str]:
+        for row in itertools.islice(self.grid, height):
+            yield "".join(str(point) for point in itertools.islice(row, width))
 
     def __getitem__(self, point: Point) -> Point:
         return self.grid[point.y][point.x]
@@ -127,12 +135,18 @@ def find_antinodes(a: Point, b: Point) -> list[Point]:
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--show", action="store_true", help="render the grid")
+    parser.add_argument("--height", type=int, help="only render this many rows")
+    parser.add_argument("--width", type=int, help="only render this many columns")
+    args = parser.parse_args()
 
     grid = Grid()
     antennas_by_frequency: defaultdict[str, list[Point]] = defaultdict(list)
     antinodes: set[Point] = set()
 
-    with open(sys.argv[1]) as f:
+    with open(args.filename) as f:
         for y, line in enumerate(f.readlines()):
             line = line.strip()
             for x, char in enumerate(line):
@@ -153,7 +167,8 @@ def main():
                             if grid.contains(node):
                                 grid[node].is_antinode = True
                                 antinodes.add(node)
-    print(grid)
+    if args.show:
+        render(grid.rows(args.height, args.width))
     print(len(antinodes))
 
 
@@ -1,9 +1,15 @@
 from dataclasses import dataclass, field
+from typing import Iterator
+import argparse
 import itertools
+import os
 import sys
 
 import traceback
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from render import render  # noqa: E402
+
 
 @dataclass
 class Block:
@@ -118,17 +124,35 @@ class Disk:
         return disk
 
     def __str__(self) -> str:
-        return "".join([str(block) for block in self.blocks])
+        return "".join(self.rows())
+
+    def rows(self, height: int | None = None, width: int = 80) -> Iterator[str]:
+        """
+        The disk in rows of width blocks, so it never has to be joined whole
+        """
+        blocks = (str(block) for block in self.blocks)
+        for chunk in itertools.islice(itertools.batched(blocks, width), height):
+            yield "".join(chunk)
 
 
 def main():
-    with open(sys.argv[1]) as f:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("filename")
+    parser.add_argument("--show", action="store_true", help="render the disk")
+    parser.add_argument("--height", type=int, help="only render this many rows")
+    parser.add_argument(
+        "--width", type=int, default=80, help="render this many blocks per row"
+    )
+    args = parser.parse_args()
+    with open(args.filename) as f:
         line = f.readline()
     line = line.strip()
     disk = Disk.from_str(line)
-    print(disk)
+    if args.show:
+        render(disk.rows(args.height, args.width))
     disk.walk()
-    print(disk)
+    if args.show:
+        render(disk.rows(args.height, args.width))
     print(disk.checksum)
 
 
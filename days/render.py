@@ -0,0 +1,14 @@
+import sys
+from typing import Iterable, TextIO
+
+
+def render(rows: Iterable[str], out: TextIO | None = None) -> None:
+    """
+    Write rows to the sink one at a time instead of joining them into one
+    string. The sink defaults to whatever sys.stdout is at call time.
+    """
+    if out is None:
+        out = sys.stdout
+    for row in rows:
+        out.write(row)
+        out.write("\n")